@@ -21,11 +21,18 @@ Tip
 from __future__ import annotations
 
 import argparse
+import codecs
+import collections
+import datetime
+import errno
 import io
+import mmap
 import os
+import re
 import sys
-import textwrap
-from typing import Iterable, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import AbstractSet, Iterable, Optional, Tuple
 
 # Optional imports for richer extraction
 try:  # PDF text extraction
@@ -100,76 +107,249 @@ EXT_TO_LANG = {
     ".tex": "tex"
 }
 
+# Frozen copies of the extension sets above, used on the per-file hot path
+_ALWAYS_SKIP_EXTS = frozenset(ALWAYS_SKIP_EXTS)
+_PREFER_TEXT_EXTS = frozenset(PREFER_TEXT_EXTS)
+
+# Matches Windows (\r\n) and old Mac (\r) line endings for normalization
+_CR = re.compile(r'\r\n?')
+
+# How many leading bytes to inspect when sniffing for binary content
+BINARY_SNIFF_BYTES = 1024
+
+# Read size for streaming text file contents to the output
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Text files larger than this are memory-mapped and streamed slice by slice
+MMAP_MIN_BYTES = 1024 * 1024
+MMAP_SLICE_BYTES = 256 * 1024
+
+# Write buffer size for the output file
+OUTPUT_BUFFER_SIZE = 1 << 20
+
+# Files up to this size are rendered by worker threads into memory; larger ones
+# are streamed to the output by the main thread so memory stays bounded
+PARALLEL_INLINE_MAX_BYTES = 1024 * 1024
+
 # --- Utility functions ---
 
+# Bytes that never count against a sample in is_probably_binary: printable ASCII
+# plus common whitespace (\t, \n, \r, \f, \b).
+_ALLOWED_BYTES = bytes(sorted(set(b"\t\n\r\f\b\x0c") | set(range(32, 127))))
+
+
 def is_probably_binary(sample: bytes) -> bool:
     """Heuristic: treat as binary if NUL present or too many non-text bytes.
 
     We allow common whitespace and printable ASCII, plus a bit of extended bytes.
     """
-    if not sample:
-        return False
-    # Any NUL byte is a strong binary signal
+    # Any NUL byte is a strong binary signal; checked first since it is a
+    # single memchr and settles most real binaries without further work
     if b"\x00" in sample:
         return True
-    # Count "suspicious" control chars (exclude common whitespace \t,\n,\r,\f)
-    text_whitelist = set(b"\t\n\r\f\b\x0c")  # include form feed for safety
-    suspicious = 0
-    for b in sample:
-        if b == 0:
-            return True
-        if 32 <= b <= 126:  # printable ASCII
-            continue
-        if b in text_whitelist:
-            continue
-        if 127 <= b <= 159:  # C1 controls often binary-ish
-            suspicious += 1
-            continue
-        # Extended bytes: allow some, but track density
-        # Count as suspicious; many of them likely not plain text in mixed repos
-        suspicious += 1
+    if not sample:
+        return False
+    # Whatever survives deleting the allowed bytes is "suspicious" (C1 controls
+    # and extended bytes alike)
+    suspicious = len(sample.translate(None, delete=_ALLOWED_BYTES))
     # If more than 30% of bytes are suspicious, call it binary
-    return suspicious / max(1, len(sample)) > 0.30
+    return suspicious / len(sample) > 0.30
+
 
+def file_ext(name: str) -> str:
+    """Return the lower-cased extension of a file name, like os.path.splitext.
+
+    Leading dots mark hidden files rather than an extension (".env" -> "").
+    Avoids the tuple and root-string allocations of splitext.
+    """
+    dot = name.rfind('.')
+    if dot <= 0 or (name[0] == '.' and not name[:dot].lstrip('.')):
+        return ''
+    return name[dot:].lower()
+
+
+def iter_files(root: str, include_hidden: bool, ignored_dirs: AbstractSet[str],
+               skip_exts: AbstractSet[str] = frozenset(),
+               only_exts: AbstractSet[str] = frozenset(),
+               max_file_size: int = 0,
+               counts: Optional[collections.Counter] = None) -> Iterable[Tuple[str, str, os.DirEntry]]:
+    """Yield (path, relpath, entry) for every candidate file under root.
+
+    Uses os.scandir directly so callers can reuse the DirEntry's cached stat
+    data. Directories are walked depth-first in the same order as os.walk
+    (files of a directory first, then its subdirectories); symlinked
+    directories are not followed and unreadable directories are skipped.
+    Files whose extension is in skip_exts (or not in a non-empty only_exts)
+    are dropped here, before anything is opened or stat'ed, as are files
+    larger than a non-zero max_file_size. Dropped files are tallied under
+    counts['filtered'] when a Counter is passed, so callers can still report
+    every file walked.
+    """
+    # Every path is under root, so the relative path is a plain prefix strip
+    root_len = len(root)
+    stack = [root]
+    while stack:
+        dirpath = stack.pop()
+        try:
+            with os.scandir(dirpath) as it:
+                entries = list(it)
+        except OSError:
+            continue
 
-def iter_files(root: str, include_hidden: bool, ignored_dirs: set[str]) -> Iterable[str]:
-    for dirpath, dirnames, filenames in os.walk(root, followlinks=False):
-        # Filter directories in-place
-        keep_dirs = []
-        for d in dirnames:
-            if not include_hidden and d.startswith('.'):
+        subdirs = []
+        for entry in entries:
+            name = entry.name
+            if not include_hidden and name.startswith('.'):
                 continue
-            if d in ignored_dirs:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if name not in ignored_dirs:
+                        subdirs.append(entry.path)
+                    continue
+                if entry.is_dir():  # symlink to a directory: don't follow
+                    continue
+            except OSError:
+                pass
+            ext = file_ext(name)
+            if ext in skip_exts or (only_exts and ext not in only_exts):
+                if counts is not None:
+                    counts['filtered'] += 1
                 continue
-            keep_dirs.append(d)
-        dirnames[:] = keep_dirs
+            if max_file_size:
+                try:
+                    if entry.stat().st_size > max_file_size:
+                        if counts is not None:
+                            counts['filtered'] += 1
+                        continue
+                except OSError:
+                    pass
+            path = entry.path
+            yield path, path[root_len:].lstrip(os.sep), entry
+
+        # Reverse so the first subdirectory is popped (and walked) first
+        stack.extend(reversed(subdirs))
+
+
+def detect_text_encoding(fb) -> str:
+    """Pick the encoding for binary file fb, reading it once from its current position.
+
+    UTF-8 is validated incrementally in STREAM_CHUNK_SIZE pieces, stopping at
+    the first invalid sequence; anything else is read as latin-1, which
+    decodes any byte sequence.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    while True:
+        chunk = fb.read(STREAM_CHUNK_SIZE)
+        try:
+            decoder.decode(chunk, final=not chunk)
+        except UnicodeDecodeError:
+            return 'latin-1'
+        if not chunk:
+            return 'utf-8'
 
-        for fname in filenames:
-            if not include_hidden and fname.startswith('.'):
-                continue
-            yield os.path.join(dirpath, fname)
+
+def is_utf8(head: bytes, rest: bytes) -> bool:
+    """Return True if head + rest is valid UTF-8, without joining the buffers."""
+    if head.isascii() and rest.isascii():
+        return True
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    try:
+        decoder.decode(head)
+        decoder.decode(rest, final=True)
+    except UnicodeDecodeError:
+        return False
+    return True
 
 
-def safe_relpath(path: str, start: str) -> str:
+def decode_text(head: bytes, rest: bytes) -> str:
+    """Decode a file read as head + rest as UTF-8, falling back to latin-1.
+
+    An incremental decoder carries multi-byte sequences split across the two
+    buffers, so they never need to be joined.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
     try:
-        return os.path.relpath(path, start)
-    except Exception:
-        return path
+        return decoder.decode(head) + decoder.decode(rest, final=True)
+    except UnicodeDecodeError:
+        return head.decode('latin-1') + rest.decode('latin-1')
 
 
-def read_text_file(path: str, encodings: Tuple[str, ...] = ("utf-8", "utf-8-sig", "latin-1", "cp1252")) -> Optional[str]:
-    for enc in encodings:
+def iter_mapped_text(mm: mmap.mmap, encoding: str) -> Iterable[str]:
+    r"""Decode a mapped file in MMAP_SLICE_BYTES slices, normalizing newlines.
+
+    A trailing \r is held back until the next slice so \r\n pairs split across
+    a slice boundary still collapse to a single \n.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+    carry = ''
+    for start in range(0, len(mm), MMAP_SLICE_BYTES):
+        text = carry + decoder.decode(mm[start:start + MMAP_SLICE_BYTES])
+        carry = ''
+        if text.endswith('\r'):
+            text, carry = text[:-1], '\r'
+        if '\r' in text:
+            text = _CR.sub('\n', text)
+        yield text
+    text = carry + decoder.decode(b'', final=True)
+    yield _CR.sub('\n', text)
+
+
+# os.sendfile errnos meaning the fd pair is unsupported, not that I/O failed
+# (ENOTSOCK: macOS/FreeBSD only accept a socket as the destination)
+_SENDFILE_UNSUPPORTED = frozenset(
+    getattr(errno, name) for name in ("EINVAL", "ENOSYS", "EOPNOTSUPP", "ENOTSUP", "ENOTSOCK")
+    if hasattr(errno, name)
+)
+
+
+def send_file(out, src, count: int) -> None:
+    """Copy the first count bytes of binary file src to the binary stream out.
+
+    Uses os.sendfile (a single in-kernel copy) when out is backed by a real
+    file descriptor, and falls back to a buffered copy otherwise.
+    """
+    offset = 0
+    sendfile = getattr(os, 'sendfile', None)
+    if sendfile is not None:
         try:
-            with io.open(path, 'r', encoding=enc, errors='strict') as f:
-                return f.read()
-        except Exception:
-            continue
-    # last resort: replace errors with placeholders to avoid crash
+            out_fd = out.fileno()
+        except (AttributeError, io.UnsupportedOperation):
+            out_fd = None
+        if out_fd is not None:
+            out.flush()
+            try:
+                while offset < count:
+                    sent = sendfile(out_fd, src.fileno(), offset, count - offset)
+                    if not sent:
+                        return
+                    offset += sent
+                return
+            except OSError as exc:
+                # Only "sendfile can't do this" falls back to a plain copy from
+                # where it stopped. For real I/O errors, check which side
+                # failed: a source read error ends the copy early (as in the
+                # fallback below), an output error (e.g. ENOSPC) propagates.
+                if exc.errno not in _SENDFILE_UNSUPPORTED:
+                    try:
+                        os.pread(src.fileno(), 1, offset)
+                    except OSError:
+                        return
+                    raise
+    # Source read errors end the copy early; output write errors propagate
     try:
-        with io.open(path, 'r', encoding='utf-8', errors='replace') as f:
-            return f.read()
+        src.seek(offset)
     except Exception:
-        return None
+        return
+    remaining = count - offset
+    while remaining > 0:
+        try:
+            chunk = src.read(min(STREAM_CHUNK_SIZE, remaining))
+        except Exception:
+            return
+        if not chunk:
+            return
+        out.write(chunk)
+        remaining -= len(chunk)
 
 
 def extract_docx_text(path: str) -> Optional[str]:
@@ -204,45 +384,66 @@ def extract_pdf_text(path: str) -> Optional[str]:
         return None
 
 
-def fence_for_ext(ext: str) -> Tuple[str, str]:
-    lang = EXT_TO_LANG.get(ext.lower(), "")
-    if lang:
-        return f"```{lang}\n", "\n```\n"
-    return "```\n", "\n```\n"
+# Fences are written to the binary output, so keep them pre-encoded
+_DEFAULT_FENCE = (b"```\n", b"\n```\n")
+_FENCE_CACHE = {ext: (f"```{lang}\n".encode('utf-8'), b"\n```\n") for ext, lang in EXT_TO_LANG.items()}
 
 
-# --- Core processing ---
+def fence_for_ext(ext: str) -> Tuple[bytes, bytes]:
+    """Return UTF-8 (open_fence, close_fence) bytes for a lower-cased extension."""
+    return _FENCE_CACHE.get(ext, _DEFAULT_FENCE)
 
-def process_file(path: str, root: str, args) -> Optional[str]:
-    """Return a string chunk to append to output, or None to skip.
 
-    Uses streaming-ish approach by returning one big string per file to keep code simple.
-    The caller writes to output file incrementally.
-    """
-    ext = os.path.splitext(path)[1].lower()
+# --- Core processing ---
 
-    # Skip by extension if clearly non-text, except allow PDFs/DOCX if we can extract
-    if ext in ALWAYS_SKIP_EXTS:
-        # allow PDF via special case if extractor exists
-        if ext in PDF_EXTS and args.pdf and _HAS_PYMUPDF:
-            pass
-        else:
-            return None
+def write_section(out, rel: str, size: int, ext: str, body) -> None:
+    """Write one file's header and fenced block to the binary stream out.
 
-    if (args.only_ext and ext not in args.only_ext) or (args.skip_ext and ext in args.skip_ext):
-        return None
+    body is a str, an iterable of chunks (str, or bytes already known to be
+    normalized UTF-8), or a callable that writes the content to out itself
+    (and handles its own read errors).
+    Text is encoded to UTF-8 once here rather than by a text layer on every
+    write.
+    """
+    open_fence, close_fence = fence_for_ext(ext)
+    out.write(f"\n===== FILE: {rel} (size={size} bytes) =====\n".encode('utf-8'))
+    out.write(open_fence)
+    if isinstance(body, str):
+        out.write(body.encode('utf-8'))
+    elif callable(body):
+        body(out)
+    else:
+        pieces = iter(body)
+        while True:
+            # Only pulling from the source is guarded; output errors propagate
+            try:
+                piece = next(pieces)
+            except StopIteration:
+                break
+            except Exception:
+                # Read failed mid-stream; keep what we have and close the fence
+                break
+            out.write(piece if isinstance(piece, bytes) else piece.encode('utf-8'))
+    out.write(close_fence)
+
+
+def process_file(path: str, rel: str, entry: os.DirEntry, args, out) -> bool:
+    """Write the file's section (header and fenced content) to the binary stream out.
+
+    Returns True if the file was included, False if it was skipped. Text files
+    are opened once; those over MMAP_MIN_BYTES are streamed so peak memory
+    stays bounded regardless of file size. Extension and size filtering have
+    already been done by iter_files.
+    """
+    ext = file_ext(entry.name)
 
     try:
-        size = os.path.getsize(path)
+        size = entry.stat().st_size
     except Exception:
         size = -1
 
-    if args.max_file_size and size > args.max_file_size:
-        return None
-
-    rel = safe_relpath(path, root)
-
-    # Decide handling path
+    # Decide handling path: extracted documents and small text files are
+    # handled as one string, larger text files are streamed
     content: Optional[str] = None
 
     if ext in DOCX_EXTS and args.docx:
@@ -252,47 +453,146 @@ def process_file(path: str, root: str, args) -> Optional[str]:
         content = extract_pdf_text(path)
 
     if content is None:
-        # For plain text-like files, quick binary sniff first
         try:
-            with open(path, 'rb') as fb:
-                head = fb.read(4096)
+            fb = open(path, 'rb')
         except Exception:
-            return None
-        # If extension not in PREFER_TEXT_EXTS, use binary heuristic
-        if ext not in PREFER_TEXT_EXTS and is_probably_binary(head):
-            return None
-        # Try reading as text
-        content = read_text_file(path)
+            return False
+        with fb:
+            # Extensions not in PREFER_TEXT_EXTS get a quick binary sniff first;
+            # known text extensions skip the probe read entirely
+            head = b""
+            if ext not in _PREFER_TEXT_EXTS:
+                try:
+                    head = fb.read(BINARY_SNIFF_BYTES)
+                except Exception:
+                    return False
+                if is_probably_binary(head):
+                    return False
+
+            if size < 0 or size > MMAP_MIN_BYTES:
+                return _stream_large_file(fb, out, rel, size, ext)
+
+            # Small files: read the rest in one go, reusing the sniffed head
+            try:
+                rest = fb.read()
+            except Exception:
+                return False
+            # UTF-8 without any \r is already in output form: copy the bytes
+            if b"\r" not in head and b"\r" not in rest and is_utf8(head, rest):
+                write_section(out, rel, size, ext, (head, rest))
+                return True
+            content = decode_text(head, rest)
+
+    # Normalize newlines (most files have no \r and skip the rewrite entirely)
+    if '\r' in content:
+        content = _CR.sub('\n', content)
+    write_section(out, rel, size, ext, content)
+    return True
+
+
+def _stream_large_file(fb, out, rel: str, size: int, ext: str) -> bool:
+    """Stream a large (or unsized) text file to out without loading it whole."""
+    # Map the file once and serve both passes from the mapping
+    mm = None
+    try:
+        mm = mmap.mmap(fb.fileno(), 0, access=mmap.ACCESS_READ)
+    except Exception:
+        mm = None
+    if mm is not None:
+        with mm:
+            try:
+                encoding = detect_text_encoding(mm)
+            except Exception:
+                return False
+            if encoding == 'utf-8' and mm.find(b"\r", 0) < 0:
+                # Already in output form: let the kernel copy it across
+                write_section(out, rel, size, ext, partial(send_file, src=fb, count=len(mm)))
+            else:
+                write_section(out, rel, size, ext, iter_mapped_text(mm, encoding))
+        return True
 
-    if content is None:
-        return None
+    try:
+        fb.seek(0)
+        encoding = detect_text_encoding(fb)
+        fb.seek(0)
+    except Exception:
+        return False
+    # Universal newline mode translates \r\n and \r to \n as it reads
+    with io.TextIOWrapper(fb, encoding=encoding, errors='replace') as text:
+        write_section(out, rel, size, ext, iter(partial(text.read, STREAM_CHUNK_SIZE), ''))
+    return True
 
-    # Normalize newlines
-    content = content.replace('\r\n', '\n').replace('\r', '\n')
 
-    # Compose header and fenced block
-    header = f"\n===== FILE: {rel} (size={size} bytes) =====\n"
-    open_fence, close_fence = fence_for_ext(ext)
+def _render_file(path: str, rel: str, entry: os.DirEntry, args) -> Optional[bytes]:
+    buf = io.BytesIO()
+    if process_file(path, rel, entry, args, buf):
+        return buf.getvalue()
+    return None
+
+
+def process_files_threaded(files: Iterable[Tuple[str, str, os.DirEntry]], args, out,
+                           jobs: int) -> Tuple[int, int]:
+    """Process files on a thread pool, writing sections to out in walk order.
+
+    Small files are rendered by workers into memory so their I/O overlaps; files larger
+    than PARALLEL_INLINE_MAX_BYTES (or of unknown size) are streamed by the
+    calling thread when their turn comes. PDF/DOCX files are also left to the calling thread when
+    extraction is enabled, since PyMuPDF does not support use from multiple
+    threads. At most jobs * 4 files are in flight at once.
+    Returns (files scanned, files included).
+    """
+    pending = collections.deque()
+    count_total = 0
+    count_included = 0
 
-    return header + open_fence + content + close_fence
+    def write_next() -> bool:
+        path, rel, entry, future = pending.popleft()
+        if future is None:
+            return process_file(path, rel, entry, args, out)
+        chunk = future.result()
+        if chunk is None:
+            return False
+        out.write(chunk)
+        return True
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        for path, rel, entry in files:
+            count_total += 1
+            try:
+                size = entry.stat().st_size
+            except Exception:
+                size = -1
+            ext = file_ext(entry.name)
+            extract = (args.pdf and ext in PDF_EXTS) or (args.docx and ext in DOCX_EXTS)
+            future = None
+            if 0 <= size <= PARALLEL_INLINE_MAX_BYTES and not extract:
+                future = pool.submit(_render_file, path, rel, entry, args)
+            pending.append((path, rel, entry, future))
+            if len(pending) >= jobs * 4:
+                count_included += write_next()
+        while pending:
+            count_included += write_next()
+
+    return count_total, count_included
 
 
 def write_header(out, root: str, args):
-    meta = textwrap.dedent(f"""
-    ==============================================
-    Repo to Text Export
-    Root: {os.path.abspath(root)}
-    Generated: (local time) {__import__('datetime').datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-    Include hidden: {args.include_hidden}
-    Max file size (bytes): {args.max_file_size if args.max_file_size else 'None'}
-    PDF extraction enabled: {args.pdf and _HAS_PYMUPDF}
-    DOCX extraction enabled: {args.docx and _HAS_PYTHON_DOCX}
-    Ignored dirs: {', '.join(sorted(args.ignore_dirs))}
-    Only extensions: {', '.join(sorted(args.only_ext)) if args.only_ext else 'None'}
-    Skipped extensions: {', '.join(sorted(args.skip_ext)) if args.skip_ext else 'None'}
-    ==============================================
-    """)
-    out.write(meta + "\n")
+    """Write the export metadata block to the binary stream out."""
+    meta = f"""
+==============================================
+Repo to Text Export
+Root: {os.path.abspath(root)}
+Generated: (local time) {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+Include hidden: {args.include_hidden}
+Max file size (bytes): {args.max_file_size if args.max_file_size else 'None'}
+PDF extraction enabled: {args.pdf and _HAS_PYMUPDF}
+DOCX extraction enabled: {args.docx and _HAS_PYTHON_DOCX}
+Ignored dirs: {', '.join(sorted(args.ignore_dirs))}
+Only extensions: {', '.join(sorted(args.only_ext)) if args.only_ext else 'None'}
+Skipped extensions: {', '.join(sorted(args.skip_ext)) if args.skip_ext else 'None'}
+==============================================
+"""
+    out.write((meta + "\n").encode('utf-8'))
 
 
 def main(argv: Optional[Iterable[str]] = None) -> int:
@@ -307,6 +607,8 @@ def main(argv: Optional[Iterable[str]] = None) -> int:
     parser.add_argument("--docx", action="store_true", help="Attempt to extract text from DOCX (requires python-docx)")
     parser.add_argument("--only-ext", nargs="*", default=[], help="Only include files with these extensions (e.g. .py .md)")
     parser.add_argument("--skip-ext", nargs="*", default=[], help="Skip files with these extensions (e.g. .log .csv)")
+    parser.add_argument("--jobs", type=int, default=min(32, (os.cpu_count() or 1) * 2),
+                        help="Worker threads for reading files (default: 2x CPU count, 1 = serial)")
 
     args = parser.parse_args(argv)
 
@@ -318,35 +620,50 @@ def main(argv: Optional[Iterable[str]] = None) -> int:
     ignore_dirs = set(args.ignore_dir)
     if not args.no_default_ignores:
         ignore_dirs |= set(DEFAULT_IGNORED_DIRS)
+    # Frozen and interned: checked against every directory name in the walk
+    ignore_dirs = frozenset(sys.intern(d) for d in ignore_dirs)
     args.ignore_dirs = ignore_dirs  # attach to args for header printing
 
     # Normalize extensions to dot-lower format
-    args.only_ext = set(e if e.startswith('.') else f'.{e}' for e in args.only_ext)
-    args.only_ext = set(e.lower() for e in args.only_ext)
-    args.skip_ext = set(e if e.startswith('.') else f'.{e}' for e in args.skip_ext)
-    args.skip_ext = set(e.lower() for e in args.skip_ext)
+    args.only_ext = frozenset('.' + e.lower().lstrip('.') for e in args.only_ext)
+    args.skip_ext = frozenset('.' + e.lower().lstrip('.') for e in args.skip_ext)
 
     if args.max_file_size is not None and args.max_file_size <= 0:
         args.max_file_size = 0
 
+    # Skip by extension if clearly non-text, except allow PDFs/DOCX if we can extract
+    allowed_binary_exts = set()
+    if args.pdf and _HAS_PYMUPDF:
+        allowed_binary_exts |= PDF_EXTS
+    if args.docx and _HAS_PYTHON_DOCX:
+        allowed_binary_exts |= DOCX_EXTS
+    skip_exts = (_ALWAYS_SKIP_EXTS - allowed_binary_exts) | args.skip_ext
+
     count_total = 0
     count_included = 0
 
-    with io.open(args.output, 'w', encoding='utf-8') as out:
+    # Binary output with a large buffer: text is encoded to UTF-8 once per
+    # piece (no text layer) and content is already \n-normalized
+    with open(args.output, 'wb', buffering=OUTPUT_BUFFER_SIZE) as out:
         write_header(out, root, args)
-        for path in iter_files(root, include_hidden=args.include_hidden, ignored_dirs=ignore_dirs):
-            count_total += 1
-            chunk = process_file(path, root, args)
-            if chunk is not None:
-                out.write(chunk)
-                if not chunk.endswith('\n'):
-                    out.write('\n')
-                count_included += 1
+        walk_counts = collections.Counter()
+        files = iter_files(root, include_hidden=args.include_hidden, ignored_dirs=ignore_dirs,
+                           skip_exts=skip_exts, only_exts=args.only_ext,
+                           max_file_size=args.max_file_size, counts=walk_counts)
+        if args.jobs > 1:
+            count_total, count_included = process_files_threaded(files, args, out, args.jobs)
+        else:
+            for path, rel, entry in files:
+                count_total += 1
+                if process_file(path, rel, entry, args, out):
+                    count_included += 1
+        # Files dropped by the walker's filters still count as scanned
+        count_total += walk_counts['filtered']
 
         # Trailer summary
-        out.write(f"\n===== SUMMARY =====\n")
-        out.write(f"Files scanned: {count_total}\n")
-        out.write(f"Files included: {count_included}\n")
+        out.write(f"\n===== SUMMARY =====\n"
+                  f"Files scanned: {count_total}\n"
+                  f"Files included: {count_included}\n".encode('utf-8'))
 
     print(f"Wrote {args.output}. Files scanned: {count_total}, included: {count_included}")
     return 0